@@ -4,12 +4,175 @@ Module for transcribing audio files to text using Whisper.
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+import hashlib
+import importlib.util
+import json
+import logging
+import os
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-import torch
-import whisper
+import numpy as np
+
+# torch, whisper and faster-whisper take seconds to import, so they are only
+# imported once a transcriber is actually built
+if TYPE_CHECKING:
+    import whisper
+    from faster_whisper import WhisperModel
+    from faster_whisper.transcribe import Segment
+    from transformers import AutomaticSpeechRecognitionPipeline
+
+
+# Sample rate Whisper models expect their input audio at
+SAMPLE_RATE = 16000
+# Shortest chunk worth transcribing in its own thread
+MIN_CHUNK_SECONDS = 60
+# Extra audio each chunk decodes past its boundary to finish the last segment
+CHUNK_OVERLAP_SECONDS = 5
+# Header written above the text of every saved transcription
+TRANSCRIPTION_HEADER = "Transcription of {name}\nLanguage: {language}\nModel: {model}\n\n"
+# JSONL file collecting the transcriptions saved to an output directory by the latest run
+SUMMARY_FILENAME = "transcripts.jsonl"
+# Directory keeping Whisper checkpoints exported to ONNX, so they are exported once
+ONNX_EXPORT_DIR = Path(os.getenv("XDG_CACHE_HOME", Path.home() / ".cache")) / "video2notes" / "onnx"
+# Approximate GPU memory, in GB, each Whisper model size needs with FP16 weights
+_MODEL_VRAM_GB = {"tiny": 1, "base": 1.5, "small": 2.5, "medium": 5, "large": 10}
+
+logger = logging.getLogger(__name__)
+
+
+def _required_vram_gb(model_name: str, compute_type: str = "float16") -> float:
+    """
+    Estimate the GPU memory a model needs, or 0 for sizes not in _MODEL_VRAM_GB.
+
+    INT8 compute types store weights in half the memory of FP16, FP32 in twice.
+    """
+    size = model_name.split(".")[0].split("-")[0]
+    required = _MODEL_VRAM_GB.get(size, 0)
+    if compute_type.startswith("int8"):
+        return required / 2
+    if compute_type == "float32":
+        return required * 2
+    return required
+
+
+def _cuda_free_gb() -> float:
+    """Return the free memory on the current CUDA device in GB."""
+    import torch
+
+    free, _ = torch.cuda.mem_get_info()
+    return free / 1024 ** 3
+
+
+def _default_device(model_name: str, compute_type: str = "float16") -> str:
+    """Use CUDA if it has room for the model's weights, else fall back to the CPU."""
+    import torch
+
+    if not torch.cuda.is_available():
+        return 'cpu'
+    free_gb = _cuda_free_gb()
+    required_gb = _required_vram_gb(model_name, compute_type)
+    if free_gb < required_gb:
+        logger.warning(
+            f"Only {free_gb:.1f} GB free on CUDA, Whisper {model_name} needs "
+            f"{required_gb:g} GB; running on CPU"
+        )
+        return 'cpu'
+    return 'cuda'
+
+
+@lru_cache(maxsize=None)
+def _load_whisper_model(model_name: str, device: str) -> "whisper.Whisper":
+    """
+    Load a Whisper model once per process and share it between transcribers.
+
+    On CUDA the weights are cast to FP16 for tensor cores, keeping layer norms in
+    FP32 as Whisper computes them in FP32, and the encoder is compiled.
+    """
+    import torch
+    import whisper
+
+    model = whisper.load_model(model_name, device=device)
+    if device == 'cuda':
+        model.half()
+        for module in model.modules():
+            if isinstance(module, torch.nn.LayerNorm):
+                module.float()
+        model.encoder = torch.compile(model.encoder, mode="reduce-overhead", fullgraph=False)
+    return model
+
+
+@lru_cache(maxsize=None)
+def _load_faster_whisper_model(
+    model_name: str,
+    device: str,
+    compute_type: str,
+    num_workers: int = 1,
+    cpu_threads: int = 0
+) -> "WhisperModel":
+    """Load a faster-whisper model once per process and share it between transcribers."""
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(
+        model_name,
+        device=device,
+        compute_type=compute_type,
+        num_workers=num_workers,
+        cpu_threads=cpu_threads
+    )
+
+
+@lru_cache(maxsize=None)
+def _load_onnx_whisper_pipeline(
+    model_name: str,
+    device: str,
+    export_dir: str
+) -> "AutomaticSpeechRecognitionPipeline":
+    """
+    Load a Whisper checkpoint exported to ONNX and wrap it in an ASR pipeline.
+
+    The checkpoint is exported, in FP32, into export_dir the first time it is
+    used and loaded from there afterwards. On CUDA, the encoder and decoder run on
+    ONNX Runtime's CUDA provider with I/O binding, so features, key/value caches
+    and logits stay on the GPU between steps.
+    """
+    from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+    from transformers import AutoProcessor, pipeline
+
+    if "/" in model_name:
+        model_id = model_name
+    else:
+        model_id = f"openai/whisper-{'large-v3' if model_name == 'large' else model_name}"
+    model_dir = Path(export_dir) / model_id.replace("/", "--")
+    provider = "CUDAExecutionProvider" if device == 'cuda' else "CPUExecutionProvider"
+    if not model_dir.exists():
+        # Exported next to the final directory and renamed, so an interrupted
+        # export is never mistaken for a complete one
+        temp_dir = model_dir.with_name(f"{model_dir.name}.tmp")
+        AutoProcessor.from_pretrained(model_id).save_pretrained(temp_dir)
+        ORTModelForSpeechSeq2Seq.from_pretrained(
+            model_id,
+            export=True,
+            provider=provider
+        ).save_pretrained(temp_dir)
+        temp_dir.replace(model_dir)
+    processor = AutoProcessor.from_pretrained(model_dir)
+    model = ORTModelForSpeechSeq2Seq.from_pretrained(
+        model_dir,
+        provider=provider,
+        use_io_binding=device == 'cuda'
+    )
+    return pipeline(
+        "automatic-speech-recognition",
+        model=model,
+        tokenizer=processor.tokenizer,
+        feature_extractor=processor.feature_extractor,
+        chunk_length_s=30,
+        device=0 if device == 'cuda' else -1
+    )
 
 
 @dataclass(frozen=True)
@@ -19,7 +182,7 @@ class TranscriptionResult:
     text: str
     audio_path: str
     language: str
-    segments: List[Dict]
+    segments: Union[List[Dict], Dict[str, np.ndarray]]
     model_used: str
 
     def __post_init__(self) -> None:
@@ -35,13 +198,21 @@ class TranscriptionResult:
 class AudioTranscriber(ABC):
     """Abstract base class for audio transcription operations."""
 
+    keep_segments: bool = False
+
     @abstractmethod
-    def transcribe(self, audio_path: str) -> TranscriptionResult:
+    def transcribe(
+        self,
+        audio_path: str,
+        audio: Optional[np.ndarray] = None
+    ) -> TranscriptionResult:
         """
         Transcribe an audio file to text.
 
         Args:
-            audio_path: Path to the input audio file.
+            audio_path: Path to the input audio file. When audio is given, only
+                       used to label the result.
+            audio: Optional 16 kHz mono float32 waveform already held in memory.
 
         Returns:
             TranscriptionResult containing the transcription and metadata.
@@ -52,43 +223,443 @@ class AudioTranscriber(ABC):
         """
         pass
 
+    @property
+    def cache_namespace(self) -> str:
+        """Identify the transcriber configuration so cached results are not shared across models."""
+        return type(self).__name__ + (":segments" if self.keep_segments else "")
+
+    def _pack_segments(self, segments: List[Dict]) -> Union[List[Dict], Dict[str, np.ndarray]]:
+        """
+        Reduce segment dicts to what the result keeps.
+
+        Returns:
+            An empty list unless keep_segments is set, else start, end and text
+            arrays holding one entry per segment, rather than a dict per segment.
+        """
+        if not self.keep_segments:
+            return []
+        return {
+            "start": np.array([segment["start"] for segment in segments], dtype=np.float32),
+            "end": np.array([segment["end"] for segment in segments], dtype=np.float32),
+            "text": np.array([segment["text"] for segment in segments], dtype=object)
+        }
+
 
 class WhisperTranscriber(AudioTranscriber):
     """Implementation of AudioTranscriber using OpenAI's Whisper model."""
 
-    def __init__(self, model_name: str = "base", device: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: str = "base",
+        device: Optional[str] = None,
+        keep_segments: bool = False
+    ):
         """
         Initialize the Whisper transcriber.
 
         Args:
             model_name: Name of the Whisper model to use (e.g., "base", "small", "medium").
-            device: Device to run the model on ("cuda" or "cpu"). If None, automatically
-                   selects CUDA if available, else CPU.
+            device: Device to run the model on ("cuda" or "cpu"). If None, selects CUDA
+                   if it has enough free memory for the model, else CPU.
+            keep_segments: Keep segment start, end and text in the results. Off by
+                          default, as only the full text is used downstream.
         """
+        import torch
+
         self.model_name = model_name
-        self.device = device or ('cuda' if torch.cuda.is_available() else 'cpu')
+        self.device = device or _default_device(model_name)
+        self.keep_segments = keep_segments
+        if self.device == 'cuda':
+            torch.backends.cuda.matmul.allow_tf32 = True
         self.model = self._load_model()
+        if self.device == 'cuda':
+            self.warmup()
 
-    def _load_model(self) -> whisper.Whisper:
+    def _load_model(self) -> "whisper.Whisper":
         """Load the Whisper model."""
         try:
-            return whisper.load_model(self.model_name).to(self.device)
+            return _load_whisper_model(self.model_name, self.device)
         except Exception as e:
             raise RuntimeError(f"Failed to load Whisper model: {str(e)}")
 
-    def transcribe(self, audio_path: str) -> TranscriptionResult:
-        """Transcribe an audio file using the Whisper model."""
+    @property
+    def cache_namespace(self) -> str:
+        """
+        Identify the transcriber configuration so cached results are not shared across models.
+
+        The model runs in FP16 with a compiled encoder on CUDA and in FP32 on CPU,
+        which changes the output, so the device is part of the namespace.
+        """
+        return f"{super().cache_namespace}:{self.model_name}:{self.device}"
+
+    def warmup(self) -> None:
+        """Transcribe 30 s of silence so the compiled encoder is ready before real work."""
+        try:
+            self.model.transcribe(np.zeros(30 * SAMPLE_RATE, dtype=np.float32))
+        except Exception as e:
+            raise RuntimeError(f"Failed to warm up Whisper model: {str(e)}")
+
+    def transcribe(
+        self,
+        audio_path: str,
+        audio: Optional[np.ndarray] = None
+    ) -> TranscriptionResult:
+        """Transcribe an audio file or in-memory waveform using the Whisper model."""
         audio_path = Path(audio_path)
-        if not audio_path.exists():
+        if audio is None and not audio_path.exists():
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
         try:
-            result = self.model.transcribe(str(audio_path))
+            result = self.model.transcribe(str(audio_path) if audio is None else audio)
             return TranscriptionResult(
                 text=result["text"],
                 audio_path=str(audio_path),
                 language=result.get("language", "unknown"),
-                segments=result.get("segments", []),
+                segments=self._pack_segments(result.get("segments", [])),
+                model_used=self.model_name
+            )
+        except Exception as e:
+            raise RuntimeError(f"Transcription failed: {str(e)}")
+
+
+class FasterWhisperTranscriber(AudioTranscriber):
+    """Implementation of AudioTranscriber using faster-whisper's batched INT8 inference."""
+
+    def __init__(
+        self,
+        model_name: str = "base",
+        device: Optional[str] = None,
+        batch_size: int = 16,
+        compute_type: Optional[str] = None,
+        num_workers: Optional[int] = None,
+        keep_segments: bool = False
+    ):
+        """
+        Initialize the faster-whisper transcriber.
+
+        Args:
+            model_name: Name of the Whisper model to use (e.g., "base", "small", "medium").
+            device: Device to run the model on ("cuda" or "cpu"). If None, selects CUDA
+                   if it has enough free memory for the model, else CPU.
+            batch_size: Number of 30 s audio windows decoded per forward pass.
+            compute_type: CTranslate2 compute type. If None, uses INT8 weights with
+                         FP16 activations on tensor-core GPUs and plain INT8 otherwise.
+                         When the device is auto-selected, a compute type too large
+                         for the free GPU memory is replaced with int8_float16.
+            num_workers: Number of audio chunks transcribed in parallel threads. If None,
+                        uses min(cpu_count // 2, 4) on CPU and 1 (batched inference) on CUDA.
+            keep_segments: Keep segment start, end and text in the results. Off by
+                          default, as only the full text is used downstream.
+        """
+        from faster_whisper import BatchedInferencePipeline
+
+        self.model_name = model_name
+        if device is None:
+            device, compute_type = self._select_device(compute_type)
+        self.device = device
+        self.batch_size = batch_size
+        self.compute_type = compute_type or self._default_compute_type()
+        self.num_workers = num_workers or self._default_num_workers()
+        self.keep_segments = keep_segments
+        self.model = self._load_model()
+        self.pipeline = BatchedInferencePipeline(model=self.model)
+
+    @property
+    def cache_namespace(self) -> str:
+        """
+        Identify the transcriber configuration so cached results are not shared across models.
+
+        Device, compute type and chunked decoding all change the output, so they
+        are part of the namespace too.
+        """
+        decoding = "chunked" if self.num_workers > 1 else "batched"
+        return (
+            f"{super().cache_namespace}:{self.model_name}:{self.device}:"
+            f"{self.compute_type}:{decoding}"
+        )
+
+    def _select_device(self, compute_type: Optional[str]) -> Tuple[str, Optional[str]]:
+        """
+        Pick CUDA if the model fits in its free memory, else the CPU.
+
+        A requested compute type that does not fit is swapped for int8_float16
+        before giving up on CUDA.
+
+        Returns:
+            The device and the compute type to use, None meaning the device default.
+        """
+        import torch
+
+        if not torch.cuda.is_available():
+            return 'cpu', compute_type
+        free_gb = _cuda_free_gb()
+        if free_gb >= _required_vram_gb(self.model_name, compute_type or "int8"):
+            return 'cuda', compute_type
+        required_gb = _required_vram_gb(self.model_name, "int8_float16")
+        if free_gb >= required_gb:
+            logger.warning(
+                f"Only {free_gb:.1f} GB free on CUDA, too little for {compute_type}; "
+                f"using int8_float16"
+            )
+            return 'cuda', "int8_float16"
+        logger.warning(
+            f"Only {free_gb:.1f} GB free on CUDA, Whisper {self.model_name} needs "
+            f"{required_gb:g} GB; running on CPU"
+        )
+        return 'cpu', None
+
+    def _default_compute_type(self) -> str:
+        """Pick the quantized compute type best supported by the device."""
+        import torch
+
+        if self.device == 'cuda' and torch.cuda.get_device_capability() >= (7, 0):
+            return "int8_float16"
+        return "int8"
+
+    def _default_num_workers(self) -> int:
+        """Parallelize over chunks on CPU; on CUDA, batching already fills the device."""
+        if self.device == 'cuda':
+            return 1
+        return max(1, min((os.cpu_count() or 1) // 2, 4))
+
+    def _load_model(self) -> "WhisperModel":
+        """Load the faster-whisper model, with one CTranslate2 worker per chunk thread."""
+        try:
+            return _load_faster_whisper_model(
+                self.model_name,
+                self.device,
+                self.compute_type,
+                self.num_workers,
+                max(1, (os.cpu_count() or 1) // self.num_workers)
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to load faster-whisper model: {str(e)}")
+
+    def transcribe(
+        self,
+        audio_path: str,
+        audio: Optional[np.ndarray] = None
+    ) -> TranscriptionResult:
+        """Transcribe an audio file or in-memory waveform in batches or parallel chunks."""
+        audio_path = Path(audio_path)
+        if audio is None and not audio_path.exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        try:
+            if self.num_workers > 1:
+                if audio is None:
+                    from faster_whisper import decode_audio
+                    audio = decode_audio(str(audio_path), sampling_rate=SAMPLE_RATE)
+                segments, language = self._transcribe_chunks(audio)
+            else:
+                batched_segments, info = self.pipeline.transcribe(
+                    str(audio_path) if audio is None else audio,
+                    batch_size=self.batch_size
+                )
+                segments = [self._segment_to_dict(segment) for segment in batched_segments]
+                language = info.language
+            return TranscriptionResult(
+                text="".join(segment["text"] for segment in segments),
+                audio_path=str(audio_path),
+                language=language or "unknown",
+                segments=self._pack_segments(segments),
+                model_used=self.model_name
+            )
+        except Exception as e:
+            raise RuntimeError(f"Transcription failed: {str(e)}")
+
+    def _transcribe_chunks(self, audio: np.ndarray) -> Tuple[List[Dict], str]:
+        """
+        Split the audio into equal chunks and transcribe them in parallel threads.
+
+        Every chunk runs CHUNK_OVERLAP_SECONDS past its end so the word crossing
+        the boundary is finished. Chunks are stitched at word level: a chunk keeps
+        the words starting before its boundary, and the next chunk the words
+        starting after the last word kept, so speech straddling a boundary is
+        neither repeated nor lost. Segments cut this way are trimmed to their
+        kept words. Timestamps are shifted back to the full audio.
+
+        Returns:
+            The stitched segments and the language detected in the first chunk.
+
+        Raises:
+            ValueError: If the audio is empty.
+        """
+        if len(audio) == 0:
+            raise ValueError("Audio is empty")
+        min_samples = MIN_CHUNK_SECONDS * SAMPLE_RATE
+        n_chunks = max(1, min(self.num_workers, len(audio) // min_samples))
+        chunk_samples = -(-len(audio) // n_chunks)
+        overlap_samples = CHUNK_OVERLAP_SECONDS * SAMPLE_RATE
+
+        def transcribe_chunk(start: int) -> Tuple[List[Dict], str]:
+            chunk_segments, info = self.model.transcribe(
+                audio[start:start + chunk_samples + overlap_samples],
+                word_timestamps=True
+            )
+            return [
+                self._segment_to_dict(segment, start / SAMPLE_RATE)
+                for segment in chunk_segments
+            ], info.language
+
+        starts = range(0, len(audio), chunk_samples)
+        with ThreadPoolExecutor(max_workers=n_chunks) as executor:
+            chunks = list(executor.map(transcribe_chunk, starts))
+
+        segments: List[Dict] = []
+        for start, (chunk_segments, _) in zip(starts, chunks):
+            kept_until = segments[-1]["end"] if segments else 0.0
+            boundary = (start + chunk_samples) / SAMPLE_RATE
+            for segment in chunk_segments:
+                words = [
+                    word for word in segment["words"]
+                    if kept_until <= word["start"] < boundary
+                ]
+                if not words:
+                    continue
+                if len(words) < len(segment["words"]):
+                    segment.update(
+                        start=words[0]["start"],
+                        end=words[-1]["end"],
+                        text="".join(word["word"] for word in words),
+                        tokens=[],
+                        words=words
+                    )
+                segments.append(segment)
+        for index, segment in enumerate(segments):
+            segment["id"] = index
+        return segments, chunks[0][1]
+
+    @staticmethod
+    def _segment_to_dict(segment: "Segment", offset: float = 0.0) -> Dict:
+        """Convert a faster-whisper segment to Whisper's segment dict, shifted by offset seconds."""
+        segment_dict = {
+            "id": segment.id,
+            "seek": segment.seek,
+            "start": segment.start + offset,
+            "end": segment.end + offset,
+            "text": segment.text,
+            "tokens": segment.tokens,
+            "temperature": segment.temperature,
+            "avg_logprob": segment.avg_logprob,
+            "compression_ratio": segment.compression_ratio,
+            "no_speech_prob": segment.no_speech_prob
+        }
+        if segment.words is not None:
+            segment_dict["words"] = [
+                {
+                    "word": word.word,
+                    "start": word.start + offset,
+                    "end": word.end + offset,
+                    "probability": word.probability
+                }
+                for word in segment.words
+            ]
+        return segment_dict
+
+
+class OnnxWhisperTranscriber(AudioTranscriber):
+    """Implementation of AudioTranscriber running Whisper on ONNX Runtime through optimum."""
+
+    def __init__(
+        self,
+        model_name: str = "base",
+        device: Optional[str] = None,
+        batch_size: int = 16,
+        keep_segments: bool = False,
+        export_dir: Optional[str] = None
+    ):
+        """
+        Initialize the ONNX Runtime transcriber.
+
+        Args:
+            model_name: Name of the Whisper model to use (e.g., "base", "small", "medium"),
+                       or a Hugging Face model id such as "distil-whisper/distil-large-v3".
+            device: Device to run the model on ("cuda" or "cpu"). If None, selects CUDA
+                   if it has enough free memory for the model, else CPU. Falls back
+                   to CPU when ONNX Runtime has no CUDA execution provider.
+            batch_size: Number of 30 s audio windows decoded per forward pass.
+            keep_segments: Keep segment start, end and text in the results. Off by
+                          default, as only the full text is used downstream.
+            export_dir: Directory keeping the ONNX export of each model. If None,
+                       uses ONNX_EXPORT_DIR.
+        """
+        self.model_name = model_name
+        # optimum exports FP32 weights, twice the size of the FP16 ones
+        self.device = device or _default_device(model_name, "float32")
+        if self.device == 'cuda' and not self._has_cuda_provider():
+            logger.warning(
+                "ONNX Runtime was installed without CUDA support (install onnxruntime-gpu "
+                "in place of onnxruntime); running on CPU"
+            )
+            self.device = 'cpu'
+        self.batch_size = batch_size
+        self.keep_segments = keep_segments
+        self.export_dir = Path(export_dir) if export_dir else ONNX_EXPORT_DIR
+        self.pipeline = self._load_model()
+
+    @staticmethod
+    def is_available() -> bool:
+        """Check whether ONNX Runtime and optimum are installed."""
+        return all(
+            importlib.util.find_spec(module) is not None
+            for module in ("onnxruntime", "optimum")
+        )
+
+    @staticmethod
+    def _has_cuda_provider() -> bool:
+        """Check whether the installed ONNX Runtime build can run on CUDA."""
+        import onnxruntime
+
+        return "CUDAExecutionProvider" in onnxruntime.get_available_providers()
+
+    @property
+    def cache_namespace(self) -> str:
+        """
+        Identify the transcriber configuration so cached results are not shared across models.
+
+        The CUDA and CPU execution providers produce slightly different output,
+        so the device is part of the namespace.
+        """
+        return f"{super().cache_namespace}:{self.model_name}:{self.device}"
+
+    def _load_model(self) -> "AutomaticSpeechRecognitionPipeline":
+        """Load the ONNX Runtime pipeline."""
+        try:
+            return _load_onnx_whisper_pipeline(self.model_name, self.device, str(self.export_dir))
+        except Exception as e:
+            raise RuntimeError(f"Failed to load ONNX Whisper model: {str(e)}")
+
+    def transcribe(
+        self,
+        audio_path: str,
+        audio: Optional[np.ndarray] = None
+    ) -> TranscriptionResult:
+        """Transcribe an audio file or in-memory waveform with ONNX Runtime."""
+        audio_path = Path(audio_path)
+        if audio is None and not audio_path.exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        try:
+            result = self.pipeline(
+                str(audio_path) if audio is None else {"raw": audio, "sampling_rate": SAMPLE_RATE},
+                batch_size=self.batch_size,
+                return_timestamps=self.keep_segments
+            )
+            # The last chunk has no end timestamp when the audio stops mid-sentence
+            segments = [
+                {
+                    "start": chunk["timestamp"][0],
+                    "end": np.nan if chunk["timestamp"][1] is None else chunk["timestamp"][1],
+                    "text": chunk["text"]
+                }
+                for chunk in result.get("chunks", [])
+            ]
+            return TranscriptionResult(
+                text=result["text"],
+                audio_path=str(audio_path),
+                language="unknown",
+                segments=self._pack_segments(segments),
                 model_used=self.model_name
             )
         except Exception as e:
@@ -98,14 +669,25 @@ class WhisperTranscriber(AudioTranscriber):
 class TranscriptionService:
     """Service class for handling batch audio transcription operations."""
 
-    def __init__(self, transcriber: AudioTranscriber):
-        """Initialize with specific transcriber implementation."""
+    def __init__(self, transcriber: AudioTranscriber, cache_dir: Optional[str] = None):
+        """
+        Initialize with specific transcriber implementation.
+
+        Args:
+            transcriber: Transcriber used for audio not found in the cache.
+            cache_dir: Optional directory caching results by audio content hash, so
+                      re-runs over the same audio skip transcription.
+        """
         self.transcriber = transcriber
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
 
     def batch_transcribe(
         self,
         audio_files: List[str],
-        output_dir: Optional[str] = None
+        output_dir: Optional[str] = None,
+        audio: Optional[List[np.ndarray]] = None
     ) -> List[TranscriptionResult]:
         """
         Transcribe multiple audio files and optionally save the results.
@@ -113,24 +695,98 @@ class TranscriptionService:
         Args:
             audio_files: List of paths to audio files to transcribe.
             output_dir: Optional directory to save transcription results.
+            audio: Optional in-memory waveforms matching audio_files one-to-one.
+                  When given, audio_files only label the results.
 
         Returns:
             List of TranscriptionResult objects.
         """
-        results = []
-        
-        if output_dir:
-            output_path = Path(output_dir)
-            output_path.mkdir(parents=True, exist_ok=True)
+        waveforms = audio if audio is not None else [None] * len(audio_files)
+        return list(self.iter_transcribe(zip(audio_files, waveforms), output_dir))
+
+    def iter_transcribe(
+        self,
+        items: Iterable[Tuple[str, Optional[np.ndarray]]],
+        output_dir: Optional[str] = None
+    ) -> Iterator[TranscriptionResult]:
+        """
+        Lazily transcribe audio and optionally save the results.
 
-        for audio_file in audio_files:
-            result = self.transcriber.transcribe(audio_file)
-            results.append(result)
+        When saving, one line per result is written to a summary JSONL file that
+        stays open, with a 1 MiB buffer, for the whole run. The file is rewritten
+        on every call, so it lists the results of the latest run only and re-runs
+        do not duplicate lines.
 
-            if output_dir:
+        Args:
+            items: (audio_file, audio) pairs, with audio as in batch_transcribe.
+            output_dir: Optional directory to save transcription results.
+
+        Yields:
+            A TranscriptionResult per item, in order.
+        """
+        if not output_dir:
+            for audio_file, waveform in items:
+                yield self._transcribe_cached(audio_file, waveform)
+            return
+
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+        with open(
+            output_path / SUMMARY_FILENAME, "w", buffering=1 << 20, encoding="utf-8"
+        ) as summary:
+            for audio_file, waveform in items:
+                result = self._transcribe_cached(audio_file, waveform)
                 self._save_transcription(result, output_path)
+                summary.write(json.dumps({
+                    "audio_path": result.audio_path,
+                    "language": result.language,
+                    "model_used": result.model_used,
+                    "text": result.text
+                }, ensure_ascii=False) + "\n")
+                yield result
+
+    def _transcribe_cached(
+        self,
+        audio_file: str,
+        audio: Optional[np.ndarray]
+    ) -> TranscriptionResult:
+        """Return the cached result for this audio content, transcribing it on a miss."""
+        if self.cache_dir is None:
+            return self.transcriber.transcribe(audio_file, audio)
+
+        cache_file = self.cache_dir / f"{self._hash_audio(audio_file, audio)}.json"
+        if cache_file.exists():
+            cached = json.loads(cache_file.read_text())
+            cached["audio_path"] = str(Path(audio_file))
+            if isinstance(cached["segments"], dict):
+                cached["segments"] = {
+                    "start": np.array(cached["segments"]["start"], dtype=np.float32),
+                    "end": np.array(cached["segments"]["end"], dtype=np.float32),
+                    "text": np.array(cached["segments"]["text"], dtype=object)
+                }
+            return TranscriptionResult(**cached)
+
+        result = self.transcriber.transcribe(audio_file, audio)
+        record = asdict(result)
+        if isinstance(result.segments, dict):
+            record["segments"] = {
+                name: column.tolist() for name, column in result.segments.items()
+            }
+        temp_file = cache_file.with_suffix(".tmp")
+        temp_file.write_text(json.dumps(record))
+        temp_file.replace(cache_file)
+        return result
 
-        return results
+    def _hash_audio(self, audio_file: str, audio: Optional[np.ndarray]) -> str:
+        """Hash the audio content, read in 1 MiB blocks from disk if not in memory."""
+        digest = hashlib.blake2b(self.transcriber.cache_namespace.encode(), digest_size=20)
+        if audio is not None:
+            digest.update(np.ascontiguousarray(audio))
+        else:
+            with open(audio_file, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+        return digest.hexdigest()
 
     def _save_transcription(self, result: TranscriptionResult, output_dir: Path) -> None:
         """
@@ -143,9 +799,12 @@ class TranscriptionService:
         audio_path = Path(result.audio_path)
         output_file = output_dir / f"{audio_path.stem}_transcription.txt"
         
-        output_file.write_text(
-            f"Transcription of {audio_path.name}\n"
-            f"Language: {result.language}\n"
-            f"Model: {result.model_used}\n\n"
-            f"{result.text}\n"
-        )
\ No newline at end of file
+        output_file.write_text("".join([
+            TRANSCRIPTION_HEADER.format(
+                name=audio_path.name,
+                language=result.language,
+                model=result.model_used
+            ),
+            result.text,
+            "\n"
+        ]))
\ No newline at end of file
@@ -3,27 +3,42 @@
 Main pipeline for converting video files to structured notes.
 """
 
+import asyncio
+import collections
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
+import itertools
 import logging
+import queue
+import threading
+import uuid
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Callable, Deque, IO, Iterable, Iterator, Optional, List, Tuple
 
 import click
-from rich.console import Console
-from rich.logging import RichHandler
+import numpy as np
 
 from videofile import Mp4VideoFinder, VideoFile
-from video2audio import AudioConverterService, Mp3Converter
-from audio2text import TranscriptionService, WhisperTranscriber
+from video2audio import AudioConverterService, Mp3Converter, pcm_to_float
+from audio2text import (
+    FasterWhisperTranscriber,
+    OnnxWhisperTranscriber,
+    TranscriptionResult,
+    TranscriptionService,
+    WhisperTranscriber
+)
 from text2notes import NotesGenerator
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
-    handlers=[RichHandler(rich_tracebacks=True)]
-)
 logger = logging.getLogger("video2notes")
-console = Console()
+
+TRANSCRIBERS = {
+    "whisper": WhisperTranscriber,
+    "faster-whisper": FasterWhisperTranscriber,
+    "onnx": OnnxWhisperTranscriber
+}
+
+# End-of-stream marker passed between pipeline stages
+_DONE = object()
 
 
 class VideoToNotesConverter:
@@ -33,7 +48,12 @@ class VideoToNotesConverter:
         self,
         whisper_model: str = "base",
         device: Optional[str] = None,
-        claude_model: str = "claude-3-5-sonnet-20241022"
+        claude_model: str = "claude-3-5-sonnet-20241022",
+        keep_audio: bool = False,
+        backend: str = "faster-whisper",
+        cache_dir: Optional[Path] = None,
+        max_concurrent_notes: int = 8,
+        cache_audio: bool = False
     ):
         """
         Initialize the conversion pipeline.
@@ -42,72 +62,63 @@ class VideoToNotesConverter:
             whisper_model: Name of the Whisper model to use
             device: Device to run Whisper on ("cuda" or "cpu")
             claude_model: Claude model to use for notes generation
+            keep_audio: Also write the intermediate MP3 files to disk
+            backend: Transcription backend, one of TRANSCRIBERS
+            cache_dir: Directory caching transcriptions and notes by content hash
+            max_concurrent_notes: Notes requests kept in flight at once in directory mode
+            cache_audio: Also keep decoded 16 kHz audio in cache_dir, so videos are not
+                         decoded again when their transcription is not cached
         """
+        self.keep_audio = keep_audio
+        self.max_concurrent_notes = max_concurrent_notes
+
         # Initialize components
         self.video_finder = Mp4VideoFinder()
-        self.audio_converter = AudioConverterService(Mp3Converter())
+        self.audio_converter = AudioConverterService(
+            Mp3Converter(),
+            cache_dir=str(cache_dir / "audio") if cache_dir and cache_audio else None
+        )
+        if backend == "onnx" and not OnnxWhisperTranscriber.is_available():
+            logger.warning("ONNX Runtime or optimum is not installed, using the whisper backend")
+            backend = "whisper"
         self.transcriber = TranscriptionService(
-            WhisperTranscriber(model_name=whisper_model, device=device)
+            TRANSCRIBERS[backend](model_name=whisper_model, device=device),
+            cache_dir=str(cache_dir / "transcriptions") if cache_dir else None
+        )
+        self.notes_generator = NotesGenerator(
+            model=claude_model,
+            cache_dir=cache_dir / "notes" if cache_dir else None
         )
-        self.notes_generator = NotesGenerator(model=claude_model)
 
     def process_single_video(
         self,
-        video_path: Path,
+        video: VideoFile,
         output_dir: Path
     ) -> Path:
         """
         Process a single video file through the complete pipeline.
         
         Args:
-            video_path: Path to the video file
+            video: VideoFile describing the video, as built by the video finder
             output_dir: Directory for output files
             
         Returns:
             Path to the generated notes file
         """
-        logger.info(f"Processing video: {video_path}")
-        
         try:
-            # Create video file object
-            video = VideoFile(
-                filename=video_path.name,
-                directory=str(video_path.parent),
-                full_path=str(video_path),
-                size_mb=video_path.stat().st_size / (1024 * 1024),
-                modified_date=video_path.stat().st_mtime
-            )
-            
-            # Create intermediary directories
-            audio_dir = output_dir / "audio"
-            transcription_dir = output_dir / "transcriptions"
-            notes_dir = output_dir / "notes"
+            audio_dir, transcription_dir, notes_dir = self._prepare_output_dirs(output_dir)
             
-            for dir_path in [audio_dir, transcription_dir, notes_dir]:
-                dir_path.mkdir(parents=True, exist_ok=True)
-            
-            # Step 1: Convert video to audio
-            audio_path = audio_dir / f"{video_path.stem}.mp3"
-            self.audio_converter.batch_convert([video], str(audio_dir))
-            logger.info(f"Created audio file: {audio_path}")
+            # Step 1: Decode the audio track into memory
+            audio = self._extract_audio(video, audio_dir)
             
             # Step 2: Transcribe audio
-            transcription_result = self.transcriber.batch_transcribe(
-                [str(audio_path)],
-                output_dir=str(transcription_dir)
-            )[0]
-            logger.info(f"Created transcription for: {video_path.name}")
+            transcription_result = self._transcribe(video, audio, transcription_dir)
             
             # Step 3: Generate notes
-            notes = self.notes_generator.generate_notes(transcription_result.text)
-            notes_path = notes_dir / f"{video_path.stem}_notes.md"
-            notes_path.write_text(notes)
-            logger.info(f"Generated notes: {notes_path}")
-            
-            return notes_path
+            return self._generate_notes(video, transcription_result, notes_dir)
             
         except Exception as e:
-            logger.error(f"Error processing {video_path}: {str(e)}")
+            logger.error(f"Error processing {video.full_path}: {str(e)}")
             raise
 
     def process_directory(
@@ -128,28 +139,323 @@ class VideoToNotesConverter:
         logger.info(f"Processing directory: {input_dir}")
         
         try:
-            # Find all videos
+            # Find videos lazily so the first one starts before the scan finishes
             videos = self.video_finder.find_videos(str(input_dir))
+            first_video = next(videos, None)
             
-            if not videos:
+            if first_video is None:
                 logger.warning(f"No MP4 videos found in {input_dir}")
                 return []
                 
-            logger.info(f"Found {len(videos)} videos to process")
+            logger.info(f"Found {first_video.filename}, processing videos as they are discovered")
             
-            # Process each video
-            notes_paths = []
-            for video in videos:
-                video_path = Path(video.full_path)
-                notes_path = self.process_single_video(video_path, output_dir)
-                notes_paths.append(notes_path)
-                
-            return notes_paths
+            return self._run_pipeline(
+                itertools.chain([first_video], videos),
+                *self._prepare_output_dirs(output_dir),
+                input_dir=input_dir
+            )
             
         except Exception as e:
             logger.error(f"Error processing directory {input_dir}: {str(e)}")
             raise
 
+    def _prepare_output_dirs(self, output_dir: Path) -> Tuple[Path, Path, Path]:
+        """Create the transcription and notes directories under output_dir."""
+        audio_dir = output_dir / "audio"
+        transcription_dir = output_dir / "transcriptions"
+        notes_dir = output_dir / "notes"
+        
+        for dir_path in [transcription_dir, notes_dir]:
+            dir_path.mkdir(parents=True, exist_ok=True)
+        
+        return audio_dir, transcription_dir, notes_dir
+
+    def _extract_audio(self, video: VideoFile, audio_dir: Path) -> np.ndarray:
+        """Decode a video's audio track, also saving it as MP3 if requested."""
+        logger.info(f"Processing video: {video.full_path}")
+        if not self.keep_audio:
+            return self.audio_converter.extract_audio_array(video.full_path)
+        audio_dir.mkdir(parents=True, exist_ok=True)
+        audio_path = audio_dir / f"{Path(video.filename).stem}.mp3"
+        pcm = self.audio_converter.extract_pcm(video.full_path, str(audio_path))
+        logger.info(f"Created audio file: {audio_path}")
+        return pcm_to_float(pcm)
+
+    def _extract_stream(
+        self,
+        items: Iterator[Tuple[VideoFile, None]],
+        audio_dir: Path
+    ) -> Iterator[Tuple[VideoFile, np.ndarray]]:
+        """Decode the audio tracks of incoming videos, as int16 PCM, with a pool of ffmpeg workers."""
+        for video, audio in self.audio_converter.iter_extract(
+            (video for video, _ in items),
+            output_dir=str(audio_dir) if self.keep_audio else None
+        ):
+            logger.info(f"Decoded audio for: {video.full_path}")
+            yield video, audio
+
+    def _transcribe(
+        self,
+        video: VideoFile,
+        audio: np.ndarray,
+        transcription_dir: Path
+    ) -> TranscriptionResult:
+        """Transcribe a decoded audio track and save the transcription."""
+        result = self.transcriber.batch_transcribe(
+            [video.full_path],
+            output_dir=str(transcription_dir),
+            audio=[audio]
+        )[0]
+        logger.info(f"Created transcription for: {video.filename}")
+        return result
+
+    def _transcribe_stream(
+        self,
+        items: Iterator[Tuple[VideoFile, np.ndarray]],
+        transcription_dir: Path
+    ) -> Iterator[Tuple[VideoFile, TranscriptionResult]]:
+        """Transcribe decoded audio tracks as they arrive, saving the transcriptions."""
+        videos: Deque[VideoFile] = collections.deque()
+        
+        def audio_items() -> Iterator[Tuple[str, np.ndarray]]:
+            for video, pcm in items:
+                videos.append(video)
+                # Converted only now, so queued tracks stay in the smaller int16 form
+                yield video.full_path, pcm_to_float(pcm)
+        
+        for result in self.transcriber.iter_transcribe(
+            audio_items(),
+            output_dir=str(transcription_dir)
+        ):
+            video = videos.popleft()
+            logger.info(f"Created transcription for: {video.filename}")
+            yield video, result
+
+    @staticmethod
+    def _notes_path(
+        video: VideoFile,
+        notes_dir: Path,
+        input_dir: Optional[Path] = None
+    ) -> Path:
+        """
+        Return the notes file for a video.
+        
+        When input_dir is given, the video's subdirectory of it is mirrored under
+        notes_dir, so same-named lectures in different folders do not collide.
+        """
+        relative_dir = Path(video.directory).relative_to(input_dir) if input_dir else Path()
+        return notes_dir / relative_dir / f"{Path(video.filename).stem}_notes.md"
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_notes_file(notes_path: Path) -> Iterator[IO[str]]:
+        """
+        Open a temporary file that replaces notes_path once the block completes.
+        
+        Each call gets its own temporary file, and it is removed if the block
+        fails or is cancelled, so no truncated notes are left behind.
+        """
+        notes_path.parent.mkdir(parents=True, exist_ok=True)
+        # Named rather than created with tempfile, which would make the notes owner-only
+        temp_path = notes_path.with_name(f"{notes_path.stem}.{uuid.uuid4().hex}.tmp")
+        try:
+            with temp_path.open("x") as notes_file:
+                yield notes_file
+            temp_path.replace(notes_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    def _generate_notes(
+        self,
+        video: VideoFile,
+        transcription: TranscriptionResult,
+        notes_dir: Path,
+        input_dir: Optional[Path] = None
+    ) -> Path:
+        """Stream notes for a transcription into a file in notes_dir, see _notes_path."""
+        notes_path = self._notes_path(video, notes_dir, input_dir)
+        with self._open_notes_file(notes_path) as notes_file:
+            self.notes_generator.generate_notes(
+                transcription.text,
+                on_text=notes_file.write
+            )
+        logger.info(f"Generated notes: {notes_path}")
+        return notes_path
+
+    async def _generate_notes_async(
+        self,
+        video: VideoFile,
+        transcription: TranscriptionResult,
+        notes_dir: Path,
+        input_dir: Optional[Path] = None
+    ) -> Path:
+        """Asynchronous counterpart of _generate_notes."""
+        notes_path = self._notes_path(video, notes_dir, input_dir)
+        with self._open_notes_file(notes_path) as notes_file:
+            await self.notes_generator.generate_notes_async(
+                transcription.text,
+                on_text=notes_file.write
+            )
+        logger.info(f"Generated notes: {notes_path}")
+        return notes_path
+
+    def _run_pipeline(
+        self,
+        videos: Iterable[VideoFile],
+        audio_dir: Path,
+        transcription_dir: Path,
+        notes_dir: Path,
+        input_dir: Optional[Path] = None
+    ) -> List[Path]:
+        """
+        Run audio extraction, transcription and notes generation as overlapping stages.
+        
+        Each stage runs in its own thread and hands its results to the next one
+        through a bounded queue, so ffmpeg decodes video N+1 while Whisper
+        transcribes video N and Claude writes the notes for earlier videos.
+        
+        Returns:
+            List of paths to generated notes files, in the order of videos
+        """
+        audio_q: "queue.Queue" = queue.Queue(maxsize=2)
+        text_q: "queue.Queue" = queue.Queue(maxsize=2)
+        abort = threading.Event()
+        
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="pipeline") as executor:
+            extract_stage = executor.submit(
+                self._run_stage,
+                lambda items: self._extract_stream(items, audio_dir),
+                (
+                    (video, None)
+                    for video in itertools.takewhile(lambda _: not abort.is_set(), videos)
+                ),
+                audio_q,
+                abort
+            )
+            transcribe_stage = executor.submit(
+                self._run_stage,
+                lambda items: self._transcribe_stream(items, transcription_dir),
+                iter(audio_q.get, _DONE),
+                text_q,
+                abort
+            )
+            notes_stage = executor.submit(
+                self._run_notes_stage,
+                iter(text_q.get, _DONE),
+                notes_dir,
+                abort,
+                input_dir
+            )
+            try:
+                extract_stage.result()
+                transcribe_stage.result()
+                return notes_stage.result()
+            except BaseException:
+                # Also on Ctrl-C, so the stages stop taking new videos and drain
+                # instead of processing the rest while the executor waits for them
+                abort.set()
+                raise
+
+    def _run_notes_stage(
+        self,
+        items: Iterator[Tuple[VideoFile, TranscriptionResult]],
+        notes_dir: Path,
+        abort: threading.Event,
+        input_dir: Optional[Path] = None
+    ) -> List[Path]:
+        """
+        Generate notes for transcriptions as they arrive, several requests at a time.
+        
+        Returns:
+            List of paths to generated notes files, in the order of items
+        """
+        try:
+            return asyncio.run(
+                self._generate_notes_concurrently(items, notes_dir, abort, input_dir)
+            )
+        except Exception:
+            abort.set()
+            for _ in items:
+                pass
+            raise
+
+    async def _generate_notes_concurrently(
+        self,
+        items: Iterator[Tuple[VideoFile, TranscriptionResult]],
+        notes_dir: Path,
+        abort: threading.Event,
+        input_dir: Optional[Path] = None
+    ) -> List[Path]:
+        """Start a notes request per item, keeping at most max_concurrent_notes in flight."""
+        semaphore = asyncio.Semaphore(self.max_concurrent_notes)
+        loop = asyncio.get_running_loop()
+        tasks = []
+        
+        async def generate(video: VideoFile, transcription: TranscriptionResult) -> Path:
+            async with semaphore:
+                try:
+                    return await self._generate_notes_async(
+                        video, transcription, notes_dir, input_dir
+                    )
+                except Exception as e:
+                    logger.error(f"Error processing {video.full_path}: {str(e)}")
+                    abort.set()
+                    raise
+        
+        try:
+            # Pull items off the queue in a worker thread so in-flight requests keep streaming
+            while (item := await loop.run_in_executor(None, next, items, _DONE)) is not _DONE:
+                if not abort.is_set():
+                    tasks.append(asyncio.create_task(generate(*item)))
+            
+            return list(await asyncio.gather(*tasks))
+        finally:
+            # Settle every request before closing the client their connections belong to
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.notes_generator.aclose()
+
+    @staticmethod
+    def _run_stage(
+        transform: Callable[[Iterator[Tuple[VideoFile, Any]]], Iterator[Tuple[VideoFile, Any]]],
+        items: Iterator[Tuple[VideoFile, Any]],
+        outbox: "queue.Queue",
+        abort: threading.Event
+    ) -> None:
+        """
+        Feed (video, payload) items through transform and pass its results to outbox.
+        
+        transform must yield exactly one result per item, in order, so a failure
+        can be attributed to the oldest item still in flight.
+        
+        Once any stage fails, the remaining items are drained without being
+        processed, so upstream stages never block on a full queue. The end
+        marker is always forwarded so downstream stages can finish.
+        """
+        in_flight: Deque[VideoFile] = collections.deque()
+        
+        def active_items() -> Iterator[Tuple[VideoFile, Any]]:
+            for video, payload in items:
+                if not abort.is_set():
+                    in_flight.append(video)
+                    yield video, payload
+        
+        try:
+            for result in transform(active_items()):
+                in_flight.popleft()
+                outbox.put(result)
+        except Exception as e:
+            if in_flight:
+                logger.error(f"Error processing {in_flight[0].full_path}: {str(e)}")
+            abort.set()
+            for _ in items:
+                pass
+            raise
+        finally:
+            outbox.put(_DONE)
+
 
 @click.command()
 @click.argument(
@@ -167,6 +473,13 @@ class VideoToNotesConverter:
     default='base',
     help='Whisper model to use for transcription'
 )
+@click.option(
+    '--backend', '-b',
+    type=click.Choice(list(TRANSCRIBERS)),
+    default='faster-whisper',
+    help='Transcription backend (faster-whisper runs INT8 batched inference, '
+         'onnx runs ONNX Runtime with CUDA I/O binding)'
+)
 @click.option(
     '--device', '-d',
     type=click.Choice(['cuda', 'cpu']),
@@ -178,6 +491,27 @@ class VideoToNotesConverter:
     default="claude-3-5-sonnet-20241022",
     help='Claude model to use for notes generation'
 )
+@click.option(
+    '--max-concurrent-notes',
+    type=click.IntRange(min=1),
+    default=8,
+    help='Maximum Claude requests in flight at once when processing a directory'
+)
+@click.option(
+    '--keep-audio',
+    is_flag=True,
+    help='Also save the intermediate MP3 files'
+)
+@click.option(
+    '--no-cache',
+    is_flag=True,
+    help='Do not reuse or store cached transcriptions and notes'
+)
+@click.option(
+    '--cache-audio',
+    is_flag=True,
+    help='Also cache decoded audio (about 115 MB per hour of video)'
+)
 @click.option(
     '--verbose', '-v',
     is_flag=True,
@@ -187,8 +521,13 @@ def main(
     input_path: Path,
     output_dir: Optional[Path],
     whisper_model: str,
+    backend: str,
     device: Optional[str],
     claude_model: str,
+    max_concurrent_notes: int,
+    keep_audio: bool,
+    no_cache: bool,
+    cache_audio: bool,
     verbose: bool
 ) -> None:
     """
@@ -200,6 +539,18 @@ def main(
     
     INPUT_PATH can be either a single video file or a directory containing videos.
     """
+    # Imported here so --help and argument errors return without loading rich
+    from rich.console import Console
+    from rich.logging import RichHandler
+
+    # Set up logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        handlers=[RichHandler(rich_tracebacks=True)]
+    )
+    console = Console()
+    
     # Set logging level
     if verbose:
         logger.setLevel(logging.DEBUG)
@@ -215,14 +566,23 @@ def main(
             pipeline = VideoToNotesConverter(
                 whisper_model=whisper_model,
                 device=device,
-                claude_model=claude_model
+                claude_model=claude_model,
+                keep_audio=keep_audio,
+                backend=backend,
+                cache_dir=None if no_cache else output_dir / ".cache",
+                max_concurrent_notes=max_concurrent_notes,
+                cache_audio=cache_audio
             )
         
         # Process based on input type
         if input_path.is_file():
             if not input_path.suffix.lower() == '.mp4':
                 raise click.BadParameter("Input file must be an MP4 video")
-            pipeline.process_single_video(input_path, output_dir)
+            video = pipeline.video_finder._create_video_file(
+                str(input_path.parent),
+                input_path.name
+            )
+            pipeline.process_single_video(video, output_dir)
         else:
             pipeline.process_directory(input_path, output_dir)
             
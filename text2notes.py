@@ -3,30 +3,39 @@
 Module for generating structured notes from lecture transcriptions using Claude.
 """
 
+import asyncio
+import hashlib
+import importlib.util
 import os
-import anthropic
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    import anthropic
+
+# Pooled connections shared by all Claude requests, at least max_concurrent_notes
+_MAX_CONNECTIONS = 16
+# Retries the SDK makes, with exponential backoff, on 429, 5xx and connection errors
+_MAX_RETRIES = 5
+
+
 class NotesGenerator:
     """Class for generating structured notes from lecture transcriptions using Claude."""
     
-    def __init__(self, model: str = "claude-3-5-sonnet-20241022"):
-        """Initialize the notes generator with specified model."""
-        load_dotenv()
-        self.client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
-        self.model = model
-        
-    def _create_system_prompt(self, transcription: str) -> str:
-        """Create the system prompt with the lecture transcription."""
-        return f"""
+    # Clients are shared by all generators so their connection pools are reused
+    _client: Optional["anthropic.Anthropic"] = None
+    _async_client: Optional["anthropic.AsyncAnthropic"] = None
+    _async_loop: Optional[asyncio.AbstractEventLoop] = None
+    # Guards client creation, as generators are used from pipeline worker threads
+    _client_lock = threading.Lock()
+
+    # Kept free of per-lecture content so the prefix is identical, and cacheable, on every call
+    _SYSTEM_PROMPT = """
 You are an AI assistant tasked with creating detailed and enriched notes from a lecture transcription. Your role is to act as a top student in a computer science class who diligently takes notes and has a keen interest in including coding examples, mathematical and science prerequisites. Your goal is to transform the given lecture transcription into comprehensive, well-structured notes that will be useful for future reference and study.
 
-Here is the lecture transcription you will be working with:
-<lecture_transcription>
-{transcription}
-</lecture_transcription>
+The lecture transcription will be provided in the user's message, inside <lecture_transcription> tags.
 
 Create your notes following this structure:
 1. Lecture Title
@@ -63,39 +72,230 @@ General guidelines:
 - If certain parts of the transcription are unclear, make a note of this in your detailed notes section.
 """
 
+    def __init__(
+        self,
+        model: str = "claude-3-5-sonnet-20241022",
+        cache_dir: Optional[Path] = None
+    ):
+        """
+        Initialize the notes generator with specified model.
+        
+        Args:
+            model: Claude model to use
+            cache_dir: Optional directory caching notes by a hash of the prompt, so
+                       unchanged transcriptions are not sent to Claude again
+        """
+        load_dotenv()
+        self.model = model
+        self.cache_dir = cache_dir
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+    @staticmethod
+    def _client_options() -> Dict:
+        """
+        Connection settings shared by the sync and async clients.
+        
+        HTTP/2 multiplexes concurrent requests over few TLS connections, and is
+        enabled when the h2 package is installed.
+        """
+        import httpx
+
+        return {
+            "http2": importlib.util.find_spec("h2") is not None,
+            "limits": httpx.Limits(
+                max_connections=_MAX_CONNECTIONS,
+                max_keepalive_connections=_MAX_CONNECTIONS
+            )
+        }
+
+    @property
+    def client(self) -> "anthropic.Anthropic":
+        """Sync client with a keep-alive connection pool, created on first use."""
+        import anthropic
+
+        cls = type(self)
+        with cls._client_lock:
+            if cls._client is None:
+                cls._client = anthropic.Anthropic(
+                    api_key=os.getenv('ANTHROPIC_API_KEY'),
+                    max_retries=_MAX_RETRIES,
+                    http_client=anthropic.DefaultHttpxClient(**self._client_options())
+                )
+            return cls._client
+
+    @property
+    def async_client(self) -> "anthropic.AsyncAnthropic":
+        """
+        Async client for the running event loop.
+        
+        Pooled connections are bound to the loop that opened them, so a new
+        client is created whenever generate_notes_async runs under a new loop.
+        Callers should release it with aclose before their loop finishes.
+        """
+        import anthropic
+
+        cls = type(self)
+        loop = asyncio.get_running_loop()
+        with cls._client_lock:
+            if cls._async_client is None or cls._async_loop is not loop:
+                cls._async_client = anthropic.AsyncAnthropic(
+                    api_key=os.getenv('ANTHROPIC_API_KEY'),
+                    max_retries=_MAX_RETRIES,
+                    http_client=anthropic.DefaultAsyncHttpxClient(**self._client_options())
+                )
+                cls._async_loop = loop
+            return cls._async_client
+
+    async def aclose(self) -> None:
+        """Close the async client of the running event loop, releasing its connections."""
+        cls = type(self)
+        with cls._client_lock:
+            client = cls._async_client
+            if client is None or cls._async_loop is not asyncio.get_running_loop():
+                return
+            cls._async_client = None
+            cls._async_loop = None
+        await client.close()
+
+    def _create_messages(self, transcription: str) -> List[Dict]:
+        """
+        Create the user message carrying the lecture transcription.
+        
+        No prompt-cache breakpoint is set. Repeated requests for a transcription
+        are served from the on-disk notes cache, so a cache write on every
+        lecture would only add its surcharge.
+        """
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": f"<lecture_transcription>\n{transcription}\n</lecture_transcription>"
+                    },
+                    {
+                        "type": "text",
+                        "text": "Please create detailed notes from the lecture transcription provided."
+                    }
+                ]
+            }
+        ]
+
+    def _cache_file(
+        self,
+        transcription: str,
+        max_tokens: int,
+        temperature: float
+    ) -> Optional[Path]:
+        """Return the cache file for a request, or None if caching is disabled."""
+        if not self.cache_dir:
+            return None
+        key = hashlib.blake2b(
+            f"{self.model}\0{max_tokens}\0{temperature}\0{self._SYSTEM_PROMPT}\0{transcription}".encode(),
+            digest_size=20
+        ).hexdigest()
+        return self.cache_dir / f"{key}.md"
+
+    @staticmethod
+    def _write_cache(cache_file: Path, notes: str) -> None:
+        """Write notes to the cache through a temporary file, so entries are never partial."""
+        temp_file = cache_file.with_suffix(".tmp")
+        temp_file.write_text(notes)
+        temp_file.replace(cache_file)
+
     def generate_notes(
         self,
         transcription: str,
         max_tokens: int = 8192,
-        temperature: float = 0
+        temperature: float = 0,
+        on_text: Optional[Callable[[str], None]] = None
     ) -> str:
         """
         Generate structured notes from a lecture transcription.
         
+        The response is streamed, so callers can consume the notes as they are
+        written instead of waiting for the whole response.
+        
+        Args:
+            transcription: The lecture transcription text
+            max_tokens: Maximum number of tokens in the response
+            temperature: Temperature parameter for response generation
+            on_text: Optional callback receiving each chunk of notes text as it arrives
+            
+        Returns:
+            Structured notes in markdown format
+        """
+        cache_file = self._cache_file(transcription, max_tokens, temperature)
+        if cache_file and cache_file.exists():
+            notes = cache_file.read_text()
+            if on_text:
+                on_text(notes)
+            return notes
+        
+        chunks = []
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=self._SYSTEM_PROMPT,
+            messages=self._create_messages(transcription)
+        ) as stream:
+            for text in stream.text_stream:
+                chunks.append(text)
+                if on_text:
+                    on_text(text)
+        
+        notes = "".join(chunks)
+        if cache_file:
+            self._write_cache(cache_file, notes)
+        return notes
+
+    async def generate_notes_async(
+        self,
+        transcription: str,
+        max_tokens: int = 8192,
+        temperature: float = 0,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Generate structured notes without blocking the event loop.
+        
+        Same as generate_notes, but lets many requests be in flight at once.
+        
         Args:
             transcription: The lecture transcription text
             max_tokens: Maximum number of tokens in the response
             temperature: Temperature parameter for response generation
+            on_text: Optional callback receiving each chunk of notes text as it arrives
             
         Returns:
             Structured notes in markdown format
         """
-        system_prompt = self._create_system_prompt(transcription)
+        cache_file = self._cache_file(transcription, max_tokens, temperature)
+        if cache_file and cache_file.exists():
+            notes = cache_file.read_text()
+            if on_text:
+                on_text(notes)
+            return notes
         
-        message = self.client.messages.create(
+        chunks = []
+        async with self.async_client.messages.stream(
             model=self.model,
             max_tokens=max_tokens,
             temperature=temperature,
-            system=system_prompt,
-            messages=[
-                {
-                    "role": "user",
-                    "content": "Please create detailed notes from the lecture transcription provided."
-                }
-            ]
-        )
+            system=self._SYSTEM_PROMPT,
+            messages=self._create_messages(transcription)
+        ) as stream:
+            async for text in stream.text_stream:
+                chunks.append(text)
+                if on_text:
+                    on_text(text)
         
-        return message.content[0].text
+        notes = "".join(chunks)
+        if cache_file:
+            self._write_cache(cache_file, notes)
+        return notes
 
 
 def save_notes(notes: str, output_path: Path) -> None:
@@ -4,13 +4,62 @@ Module for converting video files to audio format.
 """
 
 from abc import ABC, abstractmethod
-from moviepy import VideoFileClip
+import collections
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import os
+import subprocess
 from pathlib import Path
-from typing import List
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 from videofile import VideoFile
 
 
+# Whisper resamples every input to 16 kHz mono, so emit that directly.
+SAMPLE_RATE = 16000
+# Videos decoded ahead of the consumer; transcription is the slow stage, so a
+# couple of tracks are enough to keep it busy
+DECODE_AHEAD = 2
+# ffmpeg output options for a 16 kHz mono int16 PCM stream
+_PCM_OUTPUT_ARGUMENTS = [
+    "-vn",
+    "-f", "s16le",
+    "-acodec", "pcm_s16le",
+    "-ac", "1",
+    "-ar", str(SAMPLE_RATE)
+]
+
+
+def _run_ffmpeg(arguments: List[str]) -> bytes:
+    """
+    Run ffmpeg with the given arguments and return its stdout.
+
+    Args:
+        arguments: Command-line arguments passed to ffmpeg.
+
+    Returns:
+        Raw bytes written by ffmpeg to stdout.
+
+    Raises:
+        RuntimeError: If ffmpeg is missing or exits with an error.
+    """
+    command = ["ffmpeg", "-nostdin", "-loglevel", "error", *arguments]
+    try:
+        completed = subprocess.run(command, check=True, capture_output=True)
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg executable not found on PATH")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"ffmpeg failed: {e.stderr.decode(errors='replace').strip()}")
+    return completed.stdout
+
+
+def pcm_to_float(pcm: np.ndarray) -> np.ndarray:
+    """Scale 16-bit PCM to the float32 waveform in [-1, 1] Whisper expects."""
+    return pcm.astype(np.float32) / 32768.0
+
+
 class AudioConverter(ABC):
     """Abstract base class for audio conversion operations."""
     
@@ -25,26 +74,63 @@ class AudioConverter(ABC):
         """
         pass
 
+    def output_arguments(self, output_path: str) -> Optional[List[str]]:
+        """
+        Return the ffmpeg output options writing output_path, if the converter uses ffmpeg.
+        
+        These let the audio file be written by the same ffmpeg call that decodes
+        the PCM track. Converters not based on ffmpeg return None.
+        """
+        return None
+
 
 class Mp3Converter(AudioConverter):
     """Implementation of AudioConverter for MP3 format."""
     
     def convert(self, video_path: str, output_path: str) -> None:
-        """Convert a video file to MP3 format."""
-        with VideoFileClip(video_path) as clip:
-            clip.audio.write_audiofile(output_path)
+        """Convert a video file to 16 kHz mono MP3 by calling ffmpeg directly."""
+        _run_ffmpeg(["-y", "-i", video_path, *self.output_arguments(output_path)])
+
+    def output_arguments(self, output_path: str) -> List[str]:
+        """Return the ffmpeg output options writing a 16 kHz mono MP3 to output_path."""
+        return [
+            "-vn",
+            "-ac", "1",
+            "-ar", str(SAMPLE_RATE),
+            "-acodec", "libmp3lame",
+            "-q:a", "4",
+            output_path
+        ]
 
 
 class AudioConverterService:
     """Service class for handling batch audio conversion operations."""
     
-    def __init__(self, converter: AudioConverter):
-        """Initialize with specific converter implementation."""
+    def __init__(
+        self,
+        converter: AudioConverter,
+        max_workers: Optional[int] = None,
+        cache_dir: Optional[str] = None
+    ):
+        """
+        Initialize with specific converter implementation.
+        
+        Args:
+            converter: Converter used to write audio files.
+            max_workers: Number of ffmpeg processes run at once. If None, uses half
+                        the CPU cores.
+            cache_dir: Optional directory keeping decoded 16 kHz PCM, keyed by video
+                      path, size and modification time, so videos are decoded once.
+        """
         self.converter = converter
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // 2)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
     
     def batch_convert(self, videos: List[VideoFile], output_dir: str) -> None:
         """
-        Convert multiple videos to audio format.
+        Convert multiple videos to audio format, running several ffmpegs at once.
         
         Args:
             videos: List of VideoFile objects to convert.
@@ -53,6 +139,115 @@ class AudioConverterService:
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        for video in videos:
-            audio_path = output_path / f"{Path(video.filename).stem}.mp3"
-            self.converter.convert(video.full_path, str(audio_path))
\ No newline at end of file
+        audio_paths = [
+            str(output_path / f"{Path(video.filename).stem}.mp3") for video in videos
+        ]
+        # ffmpeg does the work in its own process, so threads are enough to run
+        # conversions in parallel
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(
+                self.converter.convert,
+                [video.full_path for video in videos],
+                audio_paths
+            ))
+
+    def iter_extract(
+        self,
+        videos: Iterable[VideoFile],
+        output_dir: Optional[str] = None
+    ) -> Iterator[Tuple[VideoFile, np.ndarray]]:
+        """
+        Decode the audio tracks of several videos at once, yielding them in order.
+        
+        At most DECODE_AHEAD videos, or max_workers if fewer, are decoded ahead of
+        the consumer, and tracks are held as int16 PCM, half the size of the
+        float32 waveform, until the consumer converts them with pcm_to_float.
+        
+        Args:
+            videos: VideoFile objects to decode.
+            output_dir: Optional directory where audio files should also be saved.
+            
+        Yields:
+            Each video with its 16 kHz mono int16 PCM track, as returned by extract_pcm.
+        """
+        if output_dir:
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+        
+        def extract(video: VideoFile) -> np.ndarray:
+            audio_path = None
+            if output_dir:
+                audio_path = str(Path(output_dir) / f"{Path(video.filename).stem}.mp3")
+            return self.extract_pcm(video.full_path, audio_path)
+        
+        decode_ahead = min(self.max_workers, DECODE_AHEAD)
+        with ThreadPoolExecutor(max_workers=decode_ahead) as executor:
+            pending: Deque[Tuple[VideoFile, Future]] = collections.deque()
+            for video in videos:
+                pending.append((video, executor.submit(extract, video)))
+                if len(pending) >= decode_ahead:
+                    video, future = pending.popleft()
+                    yield video, future.result()
+            while pending:
+                video, future = pending.popleft()
+                yield video, future.result()
+
+    def extract_audio_array(self, video_path: str) -> np.ndarray:
+        """
+        Decode the audio track of a video straight into memory.
+
+        Args:
+            video_path: Path to the input video file.
+
+        Returns:
+            16 kHz mono float32 waveform scaled to [-1, 1], as Whisper expects.
+        """
+        return pcm_to_float(self.extract_pcm(video_path))
+
+    def extract_pcm(self, video_path: str, output_path: Optional[str] = None) -> np.ndarray:
+        """
+        Decode the audio track of a video into memory as 16-bit PCM.
+
+        Args:
+            video_path: Path to the input video file.
+            output_path: Optional path where an audio file should also be saved.
+                        For ffmpeg-based converters it is written by the same
+                        ffmpeg call, so the video is decoded once.
+
+        Returns:
+            16 kHz mono int16 PCM samples.
+        """
+        cache_file = self._pcm_cache_file(video_path)
+        if cache_file and cache_file.exists():
+            if output_path:
+                self.converter.convert(video_path, output_path)
+            return np.load(cache_file)
+
+        arguments = ["-i", video_path, *_PCM_OUTPUT_ARGUMENTS, "-"]
+        if output_path:
+            converter_arguments = self.converter.output_arguments(output_path)
+            if converter_arguments is None:
+                self.converter.convert(video_path, output_path)
+            else:
+                arguments = [
+                    "-y", "-i", video_path,
+                    *converter_arguments,
+                    *_PCM_OUTPUT_ARGUMENTS, "-"
+                ]
+        pcm = np.frombuffer(_run_ffmpeg(arguments), np.int16)
+        if cache_file:
+            temp_file = cache_file.with_suffix(".tmp")
+            with open(temp_file, "wb") as f:
+                np.save(f, pcm)
+            temp_file.replace(cache_file)
+        return pcm
+
+    def _pcm_cache_file(self, video_path: str) -> Optional[Path]:
+        """Return the PCM cache file for a video, or None if caching is disabled."""
+        if not self.cache_dir:
+            return None
+        stats = os.stat(video_path)
+        key = hashlib.blake2b(
+            f"{os.path.abspath(video_path)}\0{stats.st_size}\0{stats.st_mtime_ns}".encode(),
+            digest_size=20
+        ).hexdigest()
+        return self.cache_dir / f"{key}.npy"
@@ -4,28 +4,45 @@ Module for handling video file operations and discovery.
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import datetime
+import logging
 import os
-import pandas as pd
-from typing import List, Dict
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
 
+if TYPE_CHECKING:
+    import pandas as pd
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
 class VideoFile:
     """Data class representing a video file with its metadata."""
+    # Declared by hand rather than with slots=True, which needs Python 3.10
+    __slots__ = ('filename', 'directory', 'full_path', 'size_mb', 'modified_date')
+
     filename: str
     directory: str
     full_path: str
     size_mb: float
     modified_date: datetime
 
+    def __getstate__(self) -> List:
+        """Return the field values, as slotted classes have no __dict__ to pickle."""
+        return [getattr(self, field.name) for field in fields(self)]
+
+    def __setstate__(self, state: List) -> None:
+        """Restore the field values, bypassing the frozen __setattr__."""
+        for field, value in zip(fields(self), state):
+            object.__setattr__(self, field.name, value)
+
 
 class VideoFinder(ABC):
     """Abstract base class for video file discovery."""
     
     @abstractmethod
-    def find_videos(self, root_dir: str) -> List[VideoFile]:
+    def find_videos(self, root_dir: str) -> Iterator[VideoFile]:
         """
         Find video files in the specified directory.
         
@@ -33,7 +50,7 @@ class VideoFinder(ABC):
             root_dir: Root directory to search for videos.
             
         Returns:
-            List of VideoFile objects found.
+            Iterator over the VideoFile objects found, yielded as the scan progresses.
         """
         pass
 
@@ -41,19 +58,38 @@ class VideoFinder(ABC):
 class Mp4VideoFinder(VideoFinder):
     """Implementation of VideoFinder for MP4 files."""
     
-    def find_videos(self, root_dir: str) -> List[VideoFile]:
-        """Find all MP4 files in the specified directory."""
-        videos = []
-        for root, _, files in os.walk(root_dir):
-            for file in files:
-                if file.endswith('.mp4'):
-                    videos.append(self._create_video_file(root, file))
-        return videos
-
-    def _create_video_file(self, root: str, filename: str) -> VideoFile:
-        """Create a VideoFile object from a file path."""
+    def find_videos(self, root_dir: str) -> Iterator[VideoFile]:
+        """
+        Lazily find all MP4 files, whatever the case of their extension, top-down.
+        
+        Like os.walk, directories that cannot be read are skipped.
+        """
+        subdirs = []
+        try:
+            entries = os.scandir(root_dir)
+        except OSError as e:
+            logger.warning(f"Skipping unreadable directory {root_dir}: {str(e)}")
+            return
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.lower().endswith('.mp4'):
+                    yield self._create_video_file(root_dir, entry.name, entry.stat())
+        for subdir in subdirs:
+            yield from self.find_videos(subdir)
+
+    def _create_video_file(
+        self,
+        root: str,
+        filename: str,
+        stats: Optional[os.stat_result] = None
+    ) -> VideoFile:
+        """Create a VideoFile object from a file path, reusing stats if already known."""
         full_path = os.path.join(root, filename)
-        stats = os.stat(full_path)
+        if stats is None:
+            stats = os.stat(full_path)
         return VideoFile(
             filename=filename,
             directory=root,
@@ -66,16 +102,21 @@ class Mp4VideoFinder(VideoFinder):
 class DataFrameConverter:
     """Utility class for converting video files to pandas DataFrames."""
     
-    def convert(self, videos: List[VideoFile]) -> pd.DataFrame:
-        """Convert a list of VideoFile objects to a DataFrame."""
-        return pd.DataFrame([self._to_dict(video) for video in videos])
-
-    def _to_dict(self, video: VideoFile) -> Dict:
-        """Convert a single VideoFile to a dictionary."""
-        return {
-            'filename': video.filename,
-            'directory': video.directory,
-            'full_path': video.full_path,
-            'size_mb': video.size_mb,
-            'modified_date': video.modified_date
-        }
\ No newline at end of file
+    def convert(self, videos: Iterable[VideoFile]) -> "pd.DataFrame":
+        """Convert VideoFile objects to a DataFrame, building it column by column."""
+        import pandas as pd
+
+        columns: Dict[str, List] = {
+            'filename': [],
+            'directory': [],
+            'full_path': [],
+            'size_mb': [],
+            'modified_date': []
+        }
+        for video in videos:
+            columns['filename'].append(video.filename)
+            columns['directory'].append(video.directory)
+            columns['full_path'].append(video.full_path)
+            columns['size_mb'].append(video.size_mb)
+            columns['modified_date'].append(video.modified_date)
+        return pd.DataFrame(columns)